@@ -1,11 +1,18 @@
 # main.py
-import os, time, random, requests
+import os, time, random, asyncio, hashlib
+from collections import deque
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from typing import Optional, Tuple
 
+import httpx
+from base58 import b58decode
+import orjson
+import redis.asyncio as aioredis
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 # ---- third-party (sign & submit) ----
@@ -15,8 +22,17 @@ from solders.commitment_config import CommitmentLevel
 from solders.rpc.config import RpcSendTransactionConfig
 from solders.rpc.requests import SendVersionedTransaction
 
+from services.rpc_batching import batch_payload, order_batch_response
+
 load_dotenv()
 
+# after load_dotenv: the burn service reads its settings from the environment
+try:
+    from services.burn_tokens import burn_tokens, warm_burn_cache
+except ImportError as e:  # dev envs without the solana/spl-token stack
+    burn_tokens = warm_burn_cache = None
+    print(f"[WARN] Burn service unavailable: {e}")
+
 # ---------- Settings ----------
 WALLET_ADDRESS      = os.getenv("WALLET_ADDRESS", "").strip()
 WALLET_PRIVATE_KEY  = os.getenv("WALLET_PRIVATE_KEY", "").strip()
@@ -25,12 +41,44 @@ PRIORITY_FEE        = float(os.getenv("PRIORITY_FEE", "0.000001"))
 TOKEN_MINT          = os.getenv("TOKEN_MINT", "").strip()
 HELIUS_API_KEY      = os.getenv("HELIUS_API_KEY", "").strip()
 FRONTEND_ORIGIN     = os.getenv("FRONTEND_ORIGIN", "").strip()
+REDIS_URL           = os.getenv("REDIS_URL", "").strip()  # required when running >1 worker
 
 if not (WALLET_ADDRESS and WALLET_PRIVATE_KEY and TOKEN_MINT and SOLANA_RPC_URL):
     print("[WARN] Missing critical .env values. Claim/Buy/Burn will fail until provided.")
 
+# decode the signing key once instead of on every submission.
+# Keypair.from_base58_string panics (pyo3 PanicException, not an Exception) on bad
+# input; decoding first and using from_bytes raises a plain ValueError instead.
+KEYPAIR: Optional[Keypair] = None
+KEYPAIR_ERROR = ""
+if WALLET_PRIVATE_KEY:
+    try:
+        KEYPAIR = Keypair.from_bytes(b58decode(WALLET_PRIVATE_KEY))
+    except Exception as e:
+        KEYPAIR_ERROR = str(e)
+        print(f"[WARN] Invalid WALLET_PRIVATE_KEY: {e}")
+
 # ---------- FastAPI ----------
-app = FastAPI(title="Tolkien Backend", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # one shared keep-alive HTTP/2 client for Solana RPC / Helius / PumpPortal;
+    # short connect/pool timeouts so a provider outage fails fast
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=8),
+        timeout=httpx.Timeout(connect=3.0, read=30.0, write=5.0, pool=2.0),
+    )
+    # shared bucket/counters/tx history across workers; None = in-process only
+    app.state.redis = aioredis.from_url(REDIS_URL, decode_responses=True) if REDIS_URL else None
+    try:
+        yield
+    finally:
+        await app.state.http.aclose()
+        if app.state.redis is not None:
+            await app.state.redis.aclose()
+
+app = FastAPI(title="Tolkien Backend", version="1.0.0", lifespan=lifespan,
+              default_response_class=ORJSONResponse)
 
 allowed_origins = {
     "http://localhost:5173",
@@ -48,12 +96,15 @@ app.add_middleware(
     allow_origins=list(allowed_origins),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 # ---------- Dashboard state ----------
+TX_HISTORY = 50
+
 STATE = {
     "price_usd": 0.0,
     "volume_change_pct": 0.0,
@@ -62,31 +113,114 @@ STATE = {
     "market_cap_usd": 0.0,
     "supply_burned_pct": 0.0,
     "last_goal_bucket": 0,     # integer bucket index we've last processed
-    "tx": [],                  # recent transactions
+    "tx": deque(maxlen=TX_HISTORY),  # recent transactions, newest first
 }
+# Without Redis the fields above are per-process; with Redis, everything but
+# the market data (each worker refreshes its own) lives under these keys.
+_SHARED_FIELDS = ("buybacks_usd", "burned_usd", "supply_burned_pct", "last_goal_bucket")
+_REDIS_PREFIX = "tolkien:"
+_REDIS_TX_KEY = _REDIS_PREFIX + "tx"
+
+# compare-and-set: only move the bucket forward, so exactly one worker wins it
+_ADVANCE_BUCKET_LUA = """
+local cur = tonumber(redis.call('GET', KEYS[1]) or '0')
+if tonumber(ARGV[1]) > cur then
+  redis.call('SET', KEYS[1], ARGV[1])
+  return 1
+end
+return 0
+"""
 
 GOAL_STEP = 100_000.0         # trigger size ($100k)
 LAMPORTS_PER_SOL = 1_000_000_000
+CONFIRM_POLL_INTERVAL = 0.15  # seconds between getSignatureStatuses polls
+CONFIRM_TIMEOUT = 5.0         # give up waiting for confirmation after this
+
+# serializes claim/buy/burn so concurrent polls can't double-submit
+PIPELINE_LOCK = asyncio.Lock()
+
+# ----- Shared state helpers -----
+async def advance_goal_bucket(bucket: int) -> bool:
+    """Record `bucket` as processed; True only for the caller that moved it forward."""
+    r = app.state.redis
+    if r is None:
+        if bucket <= STATE["last_goal_bucket"]:
+            return False
+        STATE["last_goal_bucket"] = bucket
+        return True
+    # No in-process fallback here: the CAS is what stops two workers firing the
+    # same bucket, so with Redis down we skip this poll and let a later one retry.
+    try:
+        return bool(await r.eval(_ADVANCE_BUCKET_LUA, 1, _REDIS_PREFIX + "last_goal_bucket", bucket))
+    except Exception as e:
+        print(f"[redis] warn: could not advance goal bucket, skipping pipeline: {e}")
+        return False
+
+async def add_shared(field: str, amount: float):
+    """Best-effort counter bump: a Redis error is logged, never raised."""
+    r = app.state.redis
+    if r is None:
+        STATE[field] += amount
+        return
+    try:
+        await r.incrbyfloat(_REDIS_PREFIX + field, amount)
+    except Exception as e:
+        print(f"[redis] warn: could not add {amount} to {field}: {e}")
+
+async def load_shared_state() -> dict:
+    """
+    Counters, last bucket and tx history (one Redis round-trip when shared).
+    If Redis is unreachable, logs and serves the in-process STATE instead.
+    """
+    r = app.state.redis
+    if r is not None:
+        try:
+            async with r.pipeline(transaction=False) as pipe:
+                pipe.mget([_REDIS_PREFIX + f for f in _SHARED_FIELDS])
+                pipe.lrange(_REDIS_TX_KEY, 0, TX_HISTORY - 1)
+                values, raw_tx = await pipe.execute()
+        except Exception as e:
+            print(f"[redis] warn: could not load shared state, serving local: {e}")
+            r = None
+    if r is None:
+        shared = {f: STATE[f] for f in _SHARED_FIELDS}
+        shared["tx"] = list(STATE["tx"])
+        return shared
+    shared = {f: float(v or 0) for f, v in zip(_SHARED_FIELDS, values)}
+    shared["last_goal_bucket"] = int(shared["last_goal_bucket"])
+    shared["tx"] = [orjson.loads(t) for t in raw_tx]
+    return shared
 
 # ----- TX helpers -----
-def push_tx(kind: str, amount_sol: float, desc: str, sig: Optional[str] = None):
-    STATE["tx"].insert(0, {
+async def push_tx(kind: str, amount_sol: float, desc: str, sig: Optional[str] = None):
+    """Best-effort history record: a Redis error is logged, never raised."""
+    rec = {
         "signature": sig,
         "kind": kind,  # "claim" | "buyback" | "burn"
         "amount_sol": float(amount_sol or 0),
         "status": "confirmed" if sig else "recorded",
         "timestamp": now_iso(),
         "description": desc
-    })
-    STATE["tx"] = STATE["tx"][:50]
+    }
+    r = app.state.redis
+    if r is None:
+        STATE["tx"].appendleft(rec)
+        return
+    try:
+        async with r.pipeline(transaction=True) as pipe:
+            pipe.lpush(_REDIS_TX_KEY, orjson.dumps(rec))
+            pipe.ltrim(_REDIS_TX_KEY, 0, TX_HISTORY - 1)
+            await pipe.execute()
+    except Exception as e:
+        print(f"[redis] warn: could not record {kind} tx {sig}: {e}")
 
-def get_balance_sol(pubkey: str) -> float:
+async def get_balance_sol(pubkey: str) -> float:
     try:
         payload = {"jsonrpc": "2.0", "id": 1, "method": "getBalance",
                    "params": [pubkey, {"commitment": "confirmed"}]}
-        r = requests.post(SOLANA_RPC_URL, json=payload, timeout=30)
+        r = await app.state.http.post(SOLANA_RPC_URL, json=payload)
         r.raise_for_status()
-        result = r.json()
+        result = orjson.loads(r.content)
         if "result" not in result or "value" not in result["result"]:
             raise RuntimeError(f"Invalid RPC response: {result}")
         lamports = result["result"]["value"]
@@ -95,49 +229,73 @@ def get_balance_sol(pubkey: str) -> float:
         print(f"[ERROR] Failed to get SOL balance for {pubkey}: {e}")
         return 0.0
 
-def _send_portal_tx_and_submit(raw_bytes: bytes) -> str:
+async def rpc_batch(calls: list[dict]) -> list[dict]:
+    """POST several JSON-RPC calls in one HTTP request; responses come back in call order."""
+    r = await app.state.http.post(SOLANA_RPC_URL, json=batch_payload(calls))
+    r.raise_for_status()
+    return order_batch_response(orjson.loads(r.content), len(calls))
+
+async def _send_portal_tx_and_submit(raw_bytes: bytes) -> str:
     """Sign Pump Portal tx and submit to RPC; return signature."""
-    if not WALLET_PRIVATE_KEY:
+    if KEYPAIR is None:
+        if KEYPAIR_ERROR:
+            raise RuntimeError(f"WALLET_PRIVATE_KEY is invalid: {KEYPAIR_ERROR}")
         raise RuntimeError("WALLET_PRIVATE_KEY not configured")
     
     try:
-        kp = Keypair.from_base58_string(WALLET_PRIVATE_KEY)
         portal_tx = VersionedTransaction.from_bytes(raw_bytes)
-        signed = VersionedTransaction(portal_tx.message, [kp])
+        signed = VersionedTransaction(portal_tx.message, [KEYPAIR])
 
-        cfg = RpcSendTransactionConfig(preflight_commitment=CommitmentLevel.Confirmed)
+        # PumpPortal builds these txs for us; skip the validator-side simulation.
+        # (The burn service keeps preflight on, since its amount can exceed balance.)
+        cfg = RpcSendTransactionConfig(skip_preflight=True, preflight_commitment=CommitmentLevel.Processed)
         req = SendVersionedTransaction(signed, cfg)
-        r = requests.post(SOLANA_RPC_URL, headers={"Content-Type": "application/json"},
-                          data=req.to_json(), timeout=60)
+        r = await app.state.http.post(SOLANA_RPC_URL, headers={"Content-Type": "application/json"},
+                                      content=req.to_json())
         r.raise_for_status()
-        result = r.json().get("result")
+        body = orjson.loads(r.content)
+        result = body.get("result")
         if not result:
-            error_info = r.json().get("error", {})
+            error_info = body.get("error", {})
             raise RuntimeError(f"Transaction failed: {error_info}")
         return result
     except Exception as e:
         print(f"[ERROR] Failed to submit transaction: {e}")
         raise
 
-def pump_portal_trade_local(data: dict) -> str:
-    resp = requests.post("https://pumpportal.fun/api/trade-local", data=data, timeout=60)
+async def pump_portal_trade_local(data: dict) -> str:
+    resp = await app.state.http.post("https://pumpportal.fun/api/trade-local", data=data)
     resp.raise_for_status()
-    return _send_portal_tx_and_submit(resp.content)
+    return await _send_portal_tx_and_submit(resp.content)
 
 # ----- Helius market data (price + market cap) -----
 _HELIUS_CACHE_TTL = 20  # seconds
 _last_helius_t = 0.0
+_refreshing = False
+_refresh_task: Optional[asyncio.Task] = None
 
-def refresh_market_data():
-    """Refresh STATE.price_usd and STATE.market_cap_usd from Helius (cached briefly)."""
-    global _last_helius_t
-    now = time.time()
-    if now - _last_helius_t < _HELIUS_CACHE_TTL:
-        return
+async def refresh_market_data():
+    """
+    Stale-while-revalidate: serve cached STATE and, once older than the TTL,
+    refresh from Helius in the background. Only a cold start waits on Helius.
+    """
+    global _refreshing, _refresh_task
     if not HELIUS_API_KEY:
         # keep whatever we have; dev fallback (no API key)
         return
+    if _refreshing or time.time() - _last_helius_t < _HELIUS_CACHE_TTL:
+        return
 
+    _refreshing = True
+    if _last_helius_t == 0.0:
+        # nothing cached yet — wait for the first value
+        await _refresh_helius()
+    else:
+        _refresh_task = asyncio.create_task(_refresh_helius())
+
+async def _refresh_helius():
+    """Refresh STATE.price_usd and STATE.market_cap_usd from Helius."""
+    global _last_helius_t, _refreshing
     url = f"https://mainnet.helius-rpc.com/?api-key={HELIUS_API_KEY}"
     payload = {
         "jsonrpc": "2.0",
@@ -149,9 +307,9 @@ def refresh_market_data():
         }
     }
     try:
-        r = requests.post(url, json=payload, timeout=20)
+        r = await app.state.http.post(url, json=payload)
         r.raise_for_status()
-        data = r.json()
+        data = orjson.loads(r.content)
         info = (data.get("result") or {}).get("token_info") or {}
         price_info = info.get("price_info") or {}
         supply = info.get("supply")
@@ -164,32 +322,64 @@ def refresh_market_data():
         STATE["price_usd"] = round(price, 8)
         STATE["market_cap_usd"] = round(mc, 2)
 
-        _last_helius_t = now
+        _last_helius_t = time.time()
     except Exception as e:
         # soft-fail: keep old values
         print(f"[helius] warn: {e}")
+    finally:
+        _refreshing = False
 
 # ---------- Actions ----------
-def claim_creator_fees() -> Tuple[str, float]:
+async def claim_creator_fees() -> Tuple[str, float]:
     """Claim creator fees, return (signature, claimed_SOL)."""
     if not WALLET_ADDRESS:
         raise RuntimeError("Missing WALLET_ADDRESS")
-    before = get_balance_sol(WALLET_ADDRESS)
-    sig = pump_portal_trade_local({
+    before = await get_balance_sol(WALLET_ADDRESS)
+    sig = await pump_portal_trade_local({
         "publicKey": WALLET_ADDRESS,
         "action": "collectCreatorFee",
         "priorityFee": PRIORITY_FEE,
     })
-    time.sleep(2.0)  # let balance settle
-    after = get_balance_sol(WALLET_ADDRESS)
+
+    # poll until the claim is confirmed; the balance read rides along in the same batch.
+    # Batch items may be evaluated in any order (or on different nodes), so only trust
+    # a balance whose context slot is at or after the claim's slot.
+    # The claim is already submitted here, so a failed poll must never raise: log it
+    # and keep polling, and if none succeeds still return the signature.
+    deadline = time.monotonic() + CONFIRM_TIMEOUT
+    balance = None
+    while True:
+        try:
+            polled_balance, statuses = await rpc_batch([
+                {"method": "getBalance", "params": [WALLET_ADDRESS, {"commitment": "confirmed"}]},
+                {"method": "getSignatureStatuses", "params": [[sig]]},
+            ])
+        except Exception as e:
+            print(f"[WARN] Claim {sig} confirmation poll failed: {e}")
+        else:
+            balance = polled_balance
+            status = ((statuses.get("result") or {}).get("value") or [None])[0]
+            if status and status.get("err"):
+                raise RuntimeError(f"Claim transaction failed: {status['err']}")
+            if status and status.get("confirmationStatus") in ("confirmed", "finalized"):
+                balance_slot = ((balance.get("result") or {}).get("context") or {}).get("slot") or 0
+                if balance_slot >= (status.get("slot") or 0):
+                    break
+        if time.monotonic() >= deadline:
+            print(f"[WARN] Claim {sig} not confirmed after {CONFIRM_TIMEOUT}s; using latest balance")
+            break
+        await asyncio.sleep(CONFIRM_POLL_INTERVAL)
+    if balance is None:
+        return sig, 0.0
+    after = ((balance.get("result") or {}).get("value") or 0) / LAMPORTS_PER_SOL
     claimed = max(0.0, round(after - before, 6))
     return sig, claimed
 
-def buy_back_sol(amount_sol: float) -> str:
+async def buy_back_sol(amount_sol: float) -> str:
     """Use SOL to buy TOKEN_MINT (denominated in SOL)."""
     if amount_sol <= 0:
         raise ValueError("amount_sol must be > 0")
-    sig = pump_portal_trade_local({
+    sig = await pump_portal_trade_local({
         "publicKey": WALLET_ADDRESS,
         "action": "buy",
         "mint": TOKEN_MINT,
@@ -201,72 +391,99 @@ def buy_back_sol(amount_sol: float) -> str:
     })
     return sig
 
-def burn_recently_bought(amount_sol: float) -> Optional[str]:
+def burn_recently_bought(amount_sol: float) -> str:
     """
     Burn the tokens we just bought.
     Uses the burn_tokens service to actually burn tokens on-chain.
+    Raises RuntimeError if no burn happened, so it is never recorded as one.
     """
+    if burn_tokens is None:
+        raise RuntimeError("Burn service unavailable")
     try:
-        from services.burn_tokens import burn_tokens
-        from decimal import Decimal
-        
-        # Import the burn function and burn all tokens in the wallet
         # Since we just bought with amount_sol, we burn everything we have
-        sig = burn_tokens(None, burn_all=True)
-        return sig
+        return burn_tokens(None, burn_all=True)
+    except SystemExit as e:  # the burn service reports errors via SystemExit
+        print(f"[BURN] Error burning tokens: {e}")
+        raise RuntimeError(str(e)) from e
     except Exception as e:
         print(f"[BURN] Error burning tokens: {e}")
-        # Still return None so the calling code can handle gracefully
-        return None
+        raise
 
-def process_goal_if_crossed():
+async def prefetch_burn_inputs():
+    """Warm the burn service's caches (payer, mint decimals) off the event loop."""
+    if warm_burn_cache is None:
+        return
+    try:
+        await asyncio.to_thread(warm_burn_cache)
+    except (Exception, SystemExit) as e:
+        # burn_tokens will simply fetch it again
+        print(f"[BURN] warn: prefetch failed: {e}")
+
+async def run_pipeline(current_bucket: int):
+    """Background task: run the goal pipeline at most once per bucket."""
+    async with PIPELINE_LOCK:
+        # another poll (or worker) may have handled this bucket already;
+        # otherwise remember it so we won't repeat
+        if not await advance_goal_bucket(current_bucket):
+            return
+        await execute_goal_pipeline()
+
+async def execute_goal_pipeline():
     """
-    If MC crosses a new 100k bucket since last time:
+    After MC crosses a new 100k bucket:
       1) claim creator fees
       2) buy back 25% of claimed SOL
       3) burn the bought tokens
       4) update dashboard state & tx history
     """
-    mc = float(STATE["market_cap_usd"] or 0.0)
-    current_bucket = int(mc // GOAL_STEP)
-    if current_bucket <= STATE["last_goal_bucket"]:
-        return
+    # overlap the burn's pre-reads with the claim/buy round-trips; awaited on every
+    # exit path (cancelling can't stop its worker thread) so it never outlives PIPELINE_LOCK
+    prefetch = asyncio.create_task(prefetch_burn_inputs())
+    try:
+        await _claim_buy_burn(prefetch)
+    finally:
+        await prefetch
 
-    # we moved into a new bucket — remember it so we won't repeat
-    STATE["last_goal_bucket"] = current_bucket
+async def _claim_buy_burn(prefetch: asyncio.Task):
+    # Only the on-chain calls sit inside the try blocks; bookkeeping
+    # (push_tx / add_shared) is best-effort so it can't mislabel a landed tx.
 
     # 1) Claim
     try:
-        claim_sig, claimed_sol = claim_creator_fees()
-        push_tx("claim", claimed_sol, f"Claimed creator fees: {claimed_sol} SOL", claim_sig)
+        claim_sig, claimed_sol = await claim_creator_fees()
     except Exception as e:
-        push_tx("claim", 0.0, f"Claim failed: {e}")
+        await push_tx("claim", 0.0, f"Claim failed: {e}")
         return
+    await push_tx("claim", claimed_sol, f"Claimed creator fees: {claimed_sol} SOL", claim_sig)
 
     # 2) Buy-back with 25% of claim
     buy_amount = round(claimed_sol * 0.25, 6)
     if buy_amount <= 0:
-        push_tx("buyback", 0.0, "No buyback (claimed 0 SOL)")
+        await push_tx("buyback", 0.0, "No buyback (claimed 0 SOL)")
         return
 
     try:
-        buy_sig = buy_back_sol(buy_amount)
-        push_tx("buyback", buy_amount, f"Executed buy-back of {buy_amount} SOL", buy_sig)
-        STATE["buybacks_usd"] += buy_amount * (STATE["price_usd"] or 0.0)
+        buy_sig = await buy_back_sol(buy_amount)
     except Exception as e:
-        push_tx("buyback", 0.0, f"Buyback failed: {e}")
+        await push_tx("buyback", 0.0, f"Buyback failed: {e}")
         return
+    await push_tx("buyback", buy_amount, f"Executed buy-back of {buy_amount} SOL", buy_sig)
+    await add_shared("buybacks_usd", buy_amount * (STATE["price_usd"] or 0.0))
 
     # 3) Burn what we bought (record now; wire real burn later)
     try:
-        burn_sig = burn_recently_bought(buy_amount)
-        push_tx("burn", buy_amount, f"Burned tokens bought with {buy_amount} SOL", burn_sig)
-        # If you burn 100% of what you bought, credit all of it as "burned_usd"
-        STATE["burned_usd"] += buy_amount * (STATE["price_usd"] or 0.0)
-        # Nudge the visible supply-burned percentage a bit (until you compute it exactly)
-        STATE["supply_burned_pct"] = round(min(100.0, STATE["supply_burned_pct"] + 0.05), 4)
+        await prefetch
+        # burn_tokens uses the blocking solana Client -> keep it off the event loop
+        burn_sig = await asyncio.to_thread(burn_recently_bought, buy_amount)
     except Exception as e:
-        push_tx("burn", 0.0, f"Burn failed: {e}")
+        await push_tx("burn", 0.0, f"Burn failed: {e}")
+        return
+    await push_tx("burn", buy_amount, f"Burned tokens bought with {buy_amount} SOL", burn_sig)
+    # If you burn 100% of what you bought, credit all of it as "burned_usd"
+    await add_shared("burned_usd", buy_amount * (STATE["price_usd"] or 0.0))
+    # Nudge the visible supply-burned percentage a bit (until you compute it exactly);
+    # capped at 100% when read
+    await add_shared("supply_burned_pct", 0.05)
 
 # ---------- API Models ----------
 class Dashboard(BaseModel):
@@ -282,33 +499,45 @@ class Dashboard(BaseModel):
     token_mint: str
 
 # ---------- Endpoints ----------
-@app.get("/dashboard", response_model=Dashboard)
-def get_dashboard():
+# Dashboard is only used for the OpenAPI schema: this hot GET just projects
+# STATE, so it skips response_model validation and is serialized once below.
+@app.get("/dashboard", responses={200: {"model": Dashboard}})
+async def get_dashboard(request: Request, background_tasks: BackgroundTasks):
     # 1) Refresh price / MC from Helius (cached ~20s)
-    refresh_market_data()
+    await refresh_market_data()
 
-    # 2) If a new +$100k bucket was crossed, run the pipeline
-    process_goal_if_crossed()
+    # 2) If a new +$100k bucket was crossed, run the pipeline after responding
+    shared = await load_shared_state()
+    mc = float(STATE["market_cap_usd"] or 0.0)
+    current_bucket = int(mc // GOAL_STEP)
+    if current_bucket > shared["last_goal_bucket"]:
+        background_tasks.add_task(run_pipeline, current_bucket)
 
     # 3) Compute progress within the *current* 100k bucket
-    mc = float(STATE["market_cap_usd"] or 0.0)
-    bucket_start = (int(mc // GOAL_STEP)) * GOAL_STEP
+    bucket_start = current_bucket * GOAL_STEP
     next_goal = bucket_start + GOAL_STEP
     progress_pct = 0.0 if GOAL_STEP <= 0 else max(0.0, min(100.0, (mc - bucket_start) / GOAL_STEP * 100.0))
 
-    return {
+    resp = {
         "price_usd": STATE["price_usd"],
         "volume_change_pct": STATE["volume_change_pct"],
-        "buybacks_usd": STATE["buybacks_usd"],
-        "burned_usd": STATE["burned_usd"],
+        "buybacks_usd": shared["buybacks_usd"],
+        "burned_usd": shared["burned_usd"],
         "market_cap_usd": mc,
         "next_goal_usd": next_goal,
         "next_goal_progress_pct": round(progress_pct, 2),
-        "supply_burned_pct": STATE["supply_burned_pct"],
-        "transactions": STATE["tx"],
+        "supply_burned_pct": round(min(100.0, shared["supply_burned_pct"]), 4),
+        "transactions": shared["tx"],
         "token_mint": TOKEN_MINT,
     }
 
+    # 4) Let pollers short-circuit with If-None-Match when nothing changed
+    body = orjson.dumps(resp, option=orjson.OPT_SORT_KEYS)
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
 @app.post("/simulate/bump-mc")
 def bump_market_cap(delta_usd: float = 110_000):
     """Dev helper: bump MC to force a bucket-crossing locally."""
@@ -1,7 +1,12 @@
 import os
+import re
+import json
+import base64
 import argparse
-from decimal import Decimal, ROUND_DOWN
+import functools
+import tempfile
 
+import requests
 from dotenv import load_dotenv
 from solana.rpc.api import Client
 from solana.publickey import PublicKey
@@ -17,7 +22,14 @@ from spl.token.instructions import (
 )
 from base58 import b58decode
 
-load_dotenv()
+try:
+    from services.rpc_batching import batch_payload, order_batch_response
+except ImportError:  # run directly as a script: services/ itself is on sys.path
+    from rpc_batching import batch_payload, order_batch_response
+
+if __name__ == "__main__":
+    # CLI run; main.py loads .env itself before importing this module
+    load_dotenv()
 
 RPC_URL            = os.getenv("SOLANA_RPC_URL", "https://api.mainnet-beta.solana.com").strip()
 WALLET_PRIVATE_KEY = os.getenv("WALLET_PRIVATE_KEY", "").strip()
@@ -25,11 +37,22 @@ TOKEN_MINT_STR     = os.getenv("TOKEN_MINT", "").strip()
 # Optional override for Token-2022
 TOKEN_PROGRAM_ID_STR = os.getenv("TOKEN_PROGRAM_ID", "").strip()  # e.g., "TokenzQd..."; default is classic Token Program
 
-if not (RPC_URL and WALLET_PRIVATE_KEY and TOKEN_MINT_STR):
-    raise SystemExit("Missing required .env: SOLANA_RPC_URL, WALLET_PRIVATE_KEY, TOKEN_MINT")
+# Set once on the Client; sub-calls inherit it rather than overriding per call.
+COMMITMENT = Confirmed
+
+# Env is validated/parsed on first use (not at import) so main.py can import this
+# module up front even when the burn settings are missing or malformed.
+def _require_env() -> None:
+    if not (RPC_URL and WALLET_PRIVATE_KEY and TOKEN_MINT_STR):
+        raise SystemExit("Missing required .env: SOLANA_RPC_URL, WALLET_PRIVATE_KEY, TOKEN_MINT")
 
-TOKEN_MINT = PublicKey(TOKEN_MINT_STR)
-TOKEN_PROGRAM_ID = PublicKey(TOKEN_PROGRAM_ID_STR) if TOKEN_PROGRAM_ID_STR else TOKEN_P1
+@functools.lru_cache(maxsize=1)
+def _token_mint() -> PublicKey:
+    return PublicKey(TOKEN_MINT_STR)
+
+@functools.lru_cache(maxsize=1)
+def _token_program_id() -> PublicKey:
+    return PublicKey(TOKEN_PROGRAM_ID_STR) if TOKEN_PROGRAM_ID_STR else TOKEN_P1
 
 def load_keypair_from_base58(b58: str) -> Keypair:
     """Accept either 64-byte secret key (base58) or JSON array; here we expect base58 PK."""
@@ -39,61 +62,150 @@ def load_keypair_from_base58(b58: str) -> Keypair:
     except Exception as e:
         raise SystemExit(f"Invalid WALLET_PRIVATE_KEY base58: {e}")
 
-def get_mint_decimals(client: Client, mint: PublicKey) -> int:
-    mi = client.get_token_supply(mint, commitment=Confirmed)
-    if not mi.get("result") or not mi["result"].get("value"):
+@functools.lru_cache(maxsize=1)
+def _payer() -> Keypair:
+    # decoded once per process, reused for every burn
+    return load_keypair_from_base58(WALLET_PRIVATE_KEY)
+
+def rpc_batch(calls: list[dict]) -> list[dict]:
+    r = requests.post(RPC_URL, json=batch_payload(calls), timeout=30)
+    r.raise_for_status()
+    return order_batch_response(r.json(), len(calls))
+
+def parse_mint_decimals(resp: dict, mint: PublicKey) -> int:
+    """Decimals from a getTokenSupply response."""
+    if not resp.get("result") or not resp["result"].get("value"):
         raise RuntimeError(f"Cannot fetch mint supply/decimals for {mint}")
-    return int(mi["result"]["value"]["decimals"])
-
-def read_token_balance_raw(client: Client, ata: PublicKey) -> int:
-    """Return raw token units (integer, before decimals)."""
-    ai = client.get_account_info(ata, commitment=Confirmed)
-    if not ai.get("result") or not ai["result"].get("value"):
-        return 0
-    data = ai["result"]["value"]["data"][0]
-    import base64
+    return int(resp["result"]["value"]["decimals"])
+
+def parse_token_account(resp: dict) -> tuple[bool, int]:
+    """(exists, raw token units) from a base64 getAccountInfo response."""
+    if not resp.get("result") or not resp["result"].get("value"):
+        return False, 0
+    data = resp["result"]["value"]["data"][0]
     acc = ACCOUNT_LAYOUT.parse(base64.b64decode(data))
-    return int(acc.amount)
-
-def ensure_ata(client: Client, owner: PublicKey, mint: PublicKey, payer: Keypair) -> PublicKey:
-    ata = get_associated_token_address(owner, mint, program_id=TOKEN_PROGRAM_ID)
-    info = client.get_account_info(ata, commitment=Confirmed)
-    if not info.get("result") or not info["result"].get("value"):
-        # Need to create ATA (owner must sign)
-        tx = Transaction(fee_payer=payer.public_key)
-        tx.add(
-            create_associated_token_account(
-                payer=payer.public_key,
-                owner=owner,
-                mint=mint,
-                program_id=TOKEN_PROGRAM_ID,
-            )
+    return True, int(acc.amount)
+
+# Mint decimals are immutable, so remember them per mint (in-process + on disk,
+# so one-off CLI runs skip the RPC too).
+_DECIMALS_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".mint_decimals.json")
+_mint_decimals: dict[str, int] | None = None
+
+def cached_mint_decimals(mint_str: str) -> int | None:
+    """Known decimals for mint_str, or None; never hits the RPC."""
+    global _mint_decimals
+    if _mint_decimals is None:
+        try:
+            with open(_DECIMALS_CACHE_PATH) as f:
+                _mint_decimals = {k: int(v) for k, v in json.load(f).items()}
+        except (OSError, ValueError, AttributeError):
+            _mint_decimals = {}
+    return _mint_decimals.get(mint_str)
+
+def remember_mint_decimals(mint_str: str, decimals: int) -> None:
+    cached_mint_decimals(mint_str)  # make sure the disk cache is loaded
+    _mint_decimals[mint_str] = decimals
+    # write-then-rename: threads, workers and the CLI may all write this file,
+    # and os.replace makes each write atomic so readers never see a partial one
+    tmp = None
+    try:
+        with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(_DECIMALS_CACHE_PATH),
+                                         prefix=".mint_decimals.", suffix=".tmp", delete=False) as f:
+            tmp = f.name
+            json.dump(dict(_mint_decimals), f)
+        os.replace(tmp, _DECIMALS_CACHE_PATH)
+    except OSError as e:
+        print(f"[burn] warn: could not persist mint decimals: {e}")
+        if tmp and os.path.exists(tmp):
+            os.unlink(tmp)
+
+def get_mint_decimals(client: Client, mint: PublicKey) -> int:
+    decimals = cached_mint_decimals(str(mint))
+    if decimals is None:
+        decimals = parse_mint_decimals(client.get_token_supply(mint), mint)
+        remember_mint_decimals(str(mint), decimals)
+    return decimals
+
+def fetch_ata_state(client: Client, ata: PublicKey) -> tuple[bool, int]:
+    """One getAccountInfo read -> (exists, raw token units before decimals)."""
+    return parse_token_account(client.get_account_info(ata))
+
+def create_ata(client: Client, owner: PublicKey, mint: PublicKey, payer: Keypair) -> None:
+    # owner must sign
+    tx = Transaction(fee_payer=payer.public_key)
+    tx.add(
+        create_associated_token_account(
+            payer=payer.public_key,
+            owner=owner,
+            mint=mint,
+            program_id=_token_program_id(),
         )
-        sig = client.send_transaction(tx, payer, opts={"skip_preflight": False})
-        client.confirm_transaction(sig["result"], commitment=Confirmed)
-    return ata
+    )
+    sig = client.send_transaction(tx, payer, opts={"skip_preflight": False})
+    client.confirm_transaction(sig["result"])
+
+_AMOUNT_RE = re.compile(r"\d+(\.\d*)?|\.\d+")
+
+def parse_amount(human: str) -> tuple[str, str]:
+    """Validate a human amount like '123.45' -> ('123', '45'); no network needed."""
+    human = human.strip()
+    if not _AMOUNT_RE.fullmatch(human):
+        raise SystemExit(f"Invalid amount: {human!r}")
+    int_part, _, frac = human.partition(".")
+    return int_part, frac
+
+def to_raw_amount(amount: tuple[str, str], decimals: int) -> int:
+    """Parsed amount -> raw token units, truncating digits beyond `decimals` (integer math only)."""
+    int_part, frac = amount
+    return int(int_part or "0") * 10 ** decimals + int(frac[:decimals].ljust(decimals, "0") or "0")
+
+def warm_burn_cache() -> None:
+    """Pre-load what can't change before a burn: payer, mint and its decimals."""
+    _require_env()
+    _payer()
+    mint = _token_mint()
+    if cached_mint_decimals(str(mint)) is None:
+        get_mint_decimals(Client(RPC_URL, commitment=COMMITMENT), mint)
+
+def burn_tokens(amount_tokens: str | None, burn_all: bool = False) -> str:
+    _require_env()
+    # reject bad input before any RPC; scaling waits until decimals are known
+    amount = None
+    if not burn_all:
+        if amount_tokens is None:
+            raise SystemExit("--amount is required unless --all is set")
+        amount = parse_amount(amount_tokens)
 
-def burn_tokens(amount_tokens: Decimal | None, burn_all: bool = False) -> str:
-    client = Client(RPC_URL, commitment=Confirmed)
-    payer = load_keypair_from_base58(WALLET_PRIVATE_KEY)
+    client = Client(RPC_URL, commitment=COMMITMENT)
+    mint = _token_mint()
+    payer = _payer()
     owner = payer.public_key
 
-    decimals = get_mint_decimals(client, TOKEN_MINT)
-    factor = Decimal(10) ** decimals
+    ata = get_associated_token_address(owner, mint, program_id=_token_program_id())
+    decimals = cached_mint_decimals(str(mint))
+    if decimals is None:
+        # cold cache: decimals + ATA state in a single round-trip
+        ata_resp, supply_resp = rpc_batch([
+            {"method": "getAccountInfo", "params": [str(ata), {"encoding": "base64", "commitment": COMMITMENT}]},
+            {"method": "getTokenSupply", "params": [str(mint), {"commitment": COMMITMENT}]},
+        ])
+        decimals = parse_mint_decimals(supply_resp, mint)
+        remember_mint_decimals(str(mint), decimals)
+        ata_exists, raw_bal = parse_token_account(ata_resp)
+    else:
+        ata_exists, raw_bal = fetch_ata_state(client, ata)
 
-    ata = ensure_ata(client, owner, TOKEN_MINT, payer)
-    raw_bal = Decimal(read_token_balance_raw(client, ata))
+    if not ata_exists:
+        create_ata(client, owner, mint, payer)
 
     if raw_bal <= 0:
         raise SystemExit("Nothing to burn: token balance is 0")
 
     if burn_all:
-        raw_to_burn = int(raw_bal)
+        raw_to_burn = raw_bal
     else:
-        if amount_tokens is None:
-            raise SystemExit("--amount is required unless --all is set")
         # Convert tokens → raw
-        raw_to_burn = int((amount_tokens * factor).to_integral_value(rounding=ROUND_DOWN))
+        raw_to_burn = to_raw_amount(amount, decimals)
         if raw_to_burn <= 0:
             raise SystemExit("Amount after decimals rounds to zero")
         if raw_to_burn > raw_bal:
@@ -103,9 +215,9 @@ def burn_tokens(amount_tokens: Decimal | None, burn_all: bool = False) -> str:
     tx = Transaction(fee_payer=owner)
     tx.add(
         burn_checked(
-            program_id=TOKEN_PROGRAM_ID,
+            program_id=_token_program_id(),
             account=ata,
-            mint=TOKEN_MINT,
+            mint=mint,
             owner=owner,
             amount=raw_to_burn,
             decimals=decimals,
@@ -113,7 +225,7 @@ def burn_tokens(amount_tokens: Decimal | None, burn_all: bool = False) -> str:
         )
     )
     sig = client.send_transaction(tx, payer, opts={"skip_preflight": False})
-    client.confirm_transaction(sig["result"], commitment=Confirmed)
+    client.confirm_transaction(sig["result"])
     return sig["result"]
 
 def main():
@@ -126,8 +238,7 @@ def main():
     if args.all:
         sig = burn_tokens(None, burn_all=True)
     else:
-        amt = Decimal(args.amount)
-        sig = burn_tokens(amt, burn_all=False)
+        sig = burn_tokens(args.amount, burn_all=False)
 
     print(f"Burn signature: https://solscan.io/tx/{sig}")
 
@@ -0,0 +1,13 @@
+"""JSON-RPC batch helpers shared by main.py (async httpx) and burn_tokens.py (requests)."""
+
+def batch_payload(calls: list[dict]) -> list[dict]:
+    """One request object per {"method", "params"} call; the id is its index."""
+    return [{"jsonrpc": "2.0", "id": i, **call} for i, call in enumerate(calls)]
+
+def order_batch_response(data, n_calls: int) -> list[dict]:
+    """Responses to a batch_payload() request, back in call order."""
+    if not isinstance(data, list):
+        raise RuntimeError(f"Invalid RPC batch response: {data}")
+    # servers may answer a batch in any order
+    by_id = {item.get("id"): item for item in data}
+    return [by_id.get(i, {}) for i in range(n_calls)]
@@ -49,11 +49,17 @@ function renderDashboard(d){
   list.innerHTML = cards.join('') || `<div class="text-sm opacity-70 px-2">No recent transactions.</div>`;
 }
 
+let dashboardETag = null;
+
 async function fetchDashboard(){
   try{
     if (!API_BASE) return;
-    const r = await fetch(`${API_BASE}/dashboard`, {cache:'no-store'});
+    // send the last ETag back; the backend answers 304 when nothing changed
+    const headers = dashboardETag ? {'If-None-Match': dashboardETag} : {};
+    const r = await fetch(`${API_BASE}/dashboard`, {cache:'no-store', headers});
+    if (r.status === 304) return;
     if (!r.ok) throw new Error(`HTTP ${r.status}`);
+    dashboardETag = r.headers.get('ETag');
     const data = await r.json();
     renderDashboard(data);
   }catch(err){